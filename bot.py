@@ -1,19 +1,70 @@
 import os
+import sys
+import html
+import json
+import re
+import string
+import asyncio
+import sqlite3
+import hashlib
+import secrets
+import bisect
+import signal
+import multiprocessing
+import queue
 import requests
 import logging
-from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton, InputMediaPhoto
+import httpx
+from telegram import Bot, Update, InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton, InputMediaPhoto
 from telegram.ext import Application, CommandHandler, MessageHandler, ContextTypes, filters, CallbackQueryHandler
+from telegram.error import TelegramError, TimedOut
+from telegram.request import HTTPXRequest
 from dotenv import load_dotenv
 from datetime import datetime
 import time
+from collections import deque
 from functools import lru_cache
 
+STARTED_AT = time.monotonic()
+
 load_dotenv()
 
 TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 WEATHER_API = os.getenv('WEATHER_API_KEY')
 VISUAL_CROSSING_API_KEY = os.getenv('VISUAL_CROSSING_API_KEY', 'demo')
 
+# Настройки транспорта Bot API
+SEND_POOL_SIZE = int(os.getenv('BOT_SEND_POOL_SIZE', '32'))
+UPDATES_POOL_SIZE = int(os.getenv('BOT_UPDATES_POOL_SIZE', '1'))
+POOL_TIMEOUT = float(os.getenv('BOT_POOL_TIMEOUT', '5'))
+KEEPALIVE_EXPIRY = float(os.getenv('BOT_KEEPALIVE_EXPIRY', '30'))
+HTTP_VERSION = os.getenv('BOT_HTTP_VERSION', '1.1')
+TRANSPORT_STATS_INTERVAL = int(os.getenv('BOT_TRANSPORT_STATS_INTERVAL', '300'))
+
+# Настройки аналитики
+ANALYTICS_DB = os.getenv('ANALYTICS_DB', 'analytics.db')
+ANALYTICS_BUFFER_SIZE = int(os.getenv('ANALYTICS_BUFFER_SIZE', '10000'))
+ANALYTICS_FLUSH_INTERVAL = int(os.getenv('ANALYTICS_FLUSH_INTERVAL', '10'))
+ANALYTICS_SALT = os.getenv('ANALYTICS_SALT', '')
+ANALYTICS_SALT_PATH = os.getenv('ANALYTICS_SALT_PATH', 'analytics.salt')
+
+# Каталоги сообщений
+LOCALES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'locales')
+DEFAULT_LANGUAGE = os.getenv('BOT_DEFAULT_LANGUAGE', 'ru')
+
+# Кэш погоды и снимок тёплого состояния
+WEATHER_CACHE_TTL = int(os.getenv('WEATHER_CACHE_TTL', '300'))
+WARM_STATE_PATH = os.getenv('WARM_STATE_PATH', 'warm_state.json')
+WARM_STATE_INTERVAL = int(os.getenv('WARM_STATE_INTERVAL', '60'))
+
+# Многопроцессный режим (0 - один процесс)
+WORKERS = int(os.getenv('BOT_WORKERS', '0'))
+WORKER_CHECK_INTERVAL = int(os.getenv('BOT_WORKER_CHECK_INTERVAL', '5'))
+WORKER_SHUTDOWN_TIMEOUT = int(os.getenv('BOT_WORKER_SHUTDOWN_TIMEOUT', '30'))
+INGRESS_POLL_TIMEOUT = int(os.getenv('BOT_INGRESS_POLL_TIMEOUT', '30'))
+WEATHER_FETCH_LEASE = int(os.getenv('BOT_WEATHER_FETCH_LEASE', '30'))
+SHARED_LOCK_TIMEOUT = int(os.getenv('BOT_SHARED_LOCK_TIMEOUT', '5'))
+
 # Настройка логирования
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -33,52 +84,489 @@ ULAN_UDE_COORDS = {
     'country': 'Россия'
 }
 
-async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Обработчик команды /start"""
-    keyboard = [[KeyboardButton("🚀 Начать")]]
-    reply_markup = ReplyKeyboardMarkup(keyboard, resize_keyboard=True, one_time_keyboard=True)
-    
-    welcome_text = """
-🏙️ Добро пожаловать в бот-гид по Улан-Удэ!
+class Analytics:
+    """Сбор событий взаимодействия с ботом.
+
+    События складываются в кольцевой буфер в памяти и записываются в SQLite
+    пачками из фоновой задачи, поэтому обработка апдейтов не ждёт диска.
+    """
+
+    def __init__(self, db_path, buffer_size):
+        self.db_path = db_path
+        self.buffer = deque(maxlen=buffer_size)
+        self.dropped = 0
+        self.salt = None
+
+    def load_salt(self):
+        """Загрузить соль заранее, чтобы не читать файл при обработке апдейта"""
+        if self.salt is None:
+            self.salt = load_analytics_salt()
+
+    def record(self, action, chat_id, latency, provider=None, term=None):
+        """Добавить событие в буфер (без обращения к диску)"""
+        self.load_salt()
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        now = time.time()
+        self.buffer.append((
+            now,
+            datetime.utcfromtimestamp(now).strftime('%Y-%m-%d'),
+            action,
+            hash_chat_id(chat_id, self.salt),
+            round(latency * 1000, 2),
+            provider,
+            term
+        ))
+
+    def _connect(self):
+        # Базу пишут несколько воркеров: WAL и ожидание снятия блокировки
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            """CREATE TABLE IF NOT EXISTS events (
+                ts REAL, day TEXT, action TEXT, chat_hash TEXT,
+                latency_ms REAL, provider TEXT, term TEXT
+            )"""
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS events_day ON events (day)")
+        return connection
+
+    def _write(self, events):
+        connection = self._connect()
+        try:
+            with connection:
+                connection.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?)", events)
+        finally:
+            connection.close()
+
+    async def flush(self):
+        """Записать накопленные события одной пачкой"""
+        events = []
+        while self.buffer:
+            events.append(self.buffer.popleft())
+        if not events:
+            return
+        try:
+            await asyncio.to_thread(self._write, events)
+        except Exception as e:
+            logger.error(f"Analytics flush failed: {e}")
+            self.requeue(events)
+        if self.dropped:
+            logger.warning(f"Analytics: буфер переполнен, потеряно событий: {self.dropped}")
+            self.dropped = 0
+
+    def requeue(self, events):
+        """Вернуть незаписанную пачку в начало буфера, сколько поместится"""
+        free = self.buffer.maxlen - len(self.buffer)
+        kept = events[-free:] if free else []
+        self.dropped += len(events) - len(kept)
+        self.buffer.extendleft(reversed(kept))
+
+    async def flush_loop(self):
+        """Периодическая запись буфера в базу"""
+        while True:
+            await asyncio.sleep(ANALYTICS_FLUSH_INTERVAL)
+            await self.flush()
+
+    def report(self, days=7, top_terms=10):
+        """Отчёт по дням: топ действий с перцентилями задержки, источники
+        погоды и топ слов из текстовых сообщений.
+
+        Период включает сегодняшний день: days=7 - это сегодня и шесть дней до него.
+        """
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT day, action, latency_ms, provider, term FROM events "
+                "WHERE day >= date('now', ?) ORDER BY day, action",
+                (f'-{max(days, 1) - 1} days',)
+            ).fetchall()
+        finally:
+            connection.close()
+
+        by_day = {}
+        for day, action, latency_ms, provider, term in rows:
+            day_stats = by_day.setdefault(day, {'actions': {}, 'providers': {}, 'terms': {}})
+            day_stats['actions'].setdefault(action, []).append(latency_ms)
+            if action == 'weather':
+                provider = provider or 'нет данных'
+                day_stats['providers'][provider] = day_stats['providers'].get(provider, 0) + 1
+            if term:
+                day_stats['terms'][term] = day_stats['terms'].get(term, 0) + 1
+
+        def most_common(counts, limit=None):
+            top = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+            return ", ".join(f"{name} {count}" for name, count in top)
+
+        lines = []
+        for day, day_stats in sorted(by_day.items()):
+            actions = day_stats['actions']
+            total = sum(len(latencies) for latencies in actions.values())
+            lines.append(f"{day}: событий {total}")
+            top = sorted(actions.items(), key=lambda item: len(item[1]), reverse=True)
+            for action, latencies in top:
+                latencies.sort()
+                lines.append(
+                    f"  {action:<14} {len(latencies):>6}  "
+                    f"p50={percentile(latencies, 50)}ms p95={percentile(latencies, 95)}ms "
+                    f"p99={percentile(latencies, 99)}ms"
+                )
+            if day_stats['providers']:
+                lines.append(f"  источники погоды: {most_common(day_stats['providers'])}")
+            if day_stats['terms']:
+                lines.append(f"  слова: {most_common(day_stats['terms'], top_terms)}")
+        return "\n".join(lines) if lines else "Нет данных за выбранный период"
+
+def load_analytics_salt():
+    """Соль для обезличивания chat_id: ANALYTICS_SALT или случайная, сохранённая в файл"""
+    if ANALYTICS_SALT:
+        return ANALYTICS_SALT
 
-Я расскажу тебе всё о столице солнечной Бурятии:
+    try:
+        with open(ANALYTICS_SALT_PATH, encoding='utf-8') as f:
+            salt = f.read().strip()
+        if salt:
+            return salt
+    except FileNotFoundError:
+        pass
+
+    # Файл появляется атомарно через link: при одновременном запуске
+    # нескольких процессов все получат одну и ту же соль
+    salt = secrets.token_hex(32)
+    tmp_path = f"{ANALYTICS_SALT_PATH}.{os.getpid()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(salt)
+    try:
+        os.link(tmp_path, ANALYTICS_SALT_PATH)
+        logger.info(f"Создана соль аналитики: {ANALYTICS_SALT_PATH}")
+    except FileExistsError:
+        with open(ANALYTICS_SALT_PATH, encoding='utf-8') as f:
+            salt = f.read().strip()
+    finally:
+        os.remove(tmp_path)
+    return salt
+
+def hash_chat_id(chat_id, salt):
+    """Обезличенный идентификатор чата"""
+    if chat_id is None:
+        return None
+    return hashlib.sha256(f"{salt}{chat_id}".encode()).hexdigest()[:16]
 
-• 🌤️ Текущая погода
-• 📅 Текущая дата и время
-• 🏛️ Главные достопримечательности 
-• 🍽️ Лучшие рестораны и кафе
-• 🏨 Где остановиться
-• 🛍️ Магазины и ТЦ
-• ℹ️ Интересные факты о городе
+def percentile(sorted_values, percent):
+    """Перцентиль по отсортированному списку (метод ближайшего ранга)"""
+    if not sorted_values:
+        return 0
+    index = max(0, -(-len(sorted_values) * percent // 100) - 1)
+    return sorted_values[int(index)]
 
-Нажми кнопку *"🚀 Начать"* ниже, чтобы открыть меню!
+analytics = Analytics(ANALYTICS_DB, ANALYTICS_BUFFER_SIZE)
+
+class Template:
+    """Шаблон сообщения, разобранный один раз при загрузке каталога.
+
+    Подставляемые значения экранируются для HTML-разметки Telegram:
+    поля с суффиксом _html вставляются как есть (уже готовая разметка),
+    поля с суффиксом _url экранируются как значение атрибута.
+    Формат ({x:.1f}) и преобразование ({x!r}) применяются до экранирования.
     """
 
-    await update.message.reply_text(welcome_text, reply_markup=reply_markup, parse_mode='Markdown')
+    CONVERSIONS = {None: None, 's': str, 'r': repr, 'a': ascii}
+
+    def __init__(self, source):
+        self.parts = []
+        for literal, field, spec, conversion in string.Formatter().parse(source):
+            if field is None:
+                self.parts.append((literal, None, None, None, None))
+                continue
+            if not field.isidentifier():
+                raise ValueError(f"Недопустимое имя поля: {{{field}}}")
+            if conversion not in self.CONVERSIONS:
+                raise ValueError(f"Недопустимое преобразование !{conversion} в поле {{{field}}}")
+            if '{' in spec:
+                raise ValueError(f"Вложенные поля в формате не поддерживаются: {{{field}:{spec}}}")
+
+            if field.endswith('_html'):
+                mode = 'html'
+            elif field.endswith('_url'):
+                mode = 'url'
+            else:
+                mode = 'text'
+            self.parts.append((literal, field, mode, self.CONVERSIONS[conversion], spec))
+
+    def render(self, **values):
+        """Подставить значения в шаблон"""
+        chunks = []
+        for literal, field, mode, convert, spec in self.parts:
+            chunks.append(literal)
+            if field is None:
+                continue
+            value = values[field]
+            if convert is not None:
+                value = convert(value)
+            value = format(value, spec)
+            if mode == 'text':
+                value = html.escape(value, quote=False)
+            elif mode == 'url':
+                value = html.escape(value)
+            chunks.append(value)
+        return ''.join(chunks)
+
+class Catalog:
+    """Каталог сообщений одного языка"""
+
+    def __init__(self, language, data):
+        self.language = language
+        self.buttons = data['buttons']
+        self.triggers = data['triggers']
+        self.trigger_pattern = self.compile_triggers(data['triggers'], data['trigger_match'])
+        self.days = data['days']
+        self.months = data['months']
+        self.greetings = data['greetings']
+        self.seasons = data['seasons']
+        self.venues = data['venues']
+        self.templates = {}
+        for name, source in data['messages'].items():
+            if isinstance(source, list):
+                source = "\n".join(source)
+            try:
+                self.templates[name] = Template(source)
+            except ValueError as e:
+                raise ValueError(f"Каталог '{language}', сообщение '{name}': {e}") from e
+
+    @staticmethod
+    def compile_triggers(triggers, mode):
+        """Регулярное выражение для поиска слов-триггеров.
+
+        substring - триггер может быть частью слова (основы русских слов
+        совпадают со всеми падежами: "погоду", "байкале"), word - только
+        целое слово (английское "date" не должно срабатывать на "update").
+        """
+        if mode not in ('substring', 'word'):
+            raise ValueError(f"Неизвестный режим trigger_match: {mode}")
+        # Длинные триггеры раньше коротких: "улан-удэ" важнее "улан"
+        alternatives = '|'.join(re.escape(trigger.lower()) for trigger in sorted(triggers, key=len, reverse=True))
+        if mode == 'word':
+            return re.compile(rf'(?<!\w)(?:{alternatives})(?!\w)')
+        return re.compile(alternatives)
+
+    def match_trigger(self, text):
+        """Первое слово-триггер в тексте (в нижнем регистре) или None"""
+        match = self.trigger_pattern.search(text)
+        return match.group() if match else None
+
+    def render(self, name, /, **values):
+        """Отрисовать сообщение по имени шаблона"""
+        return self.templates[name].render(**values)
+
+def load_catalogs():
+    """Загрузка и компиляция каталогов сообщений из locales/*.json"""
+    raw = {}
+    for filename in sorted(os.listdir(LOCALES_DIR)):
+        if filename.endswith('.json'):
+            with open(os.path.join(LOCALES_DIR, filename), encoding='utf-8') as f:
+                raw[filename[:-len('.json')]] = json.load(f)
+
+    if DEFAULT_LANGUAGE not in raw:
+        raise RuntimeError(f"Нет каталога сообщений для языка по умолчанию: {DEFAULT_LANGUAGE}")
+
+    # Недостающие в каталоге строки берутся из языка по умолчанию
+    base = raw[DEFAULT_LANGUAGE]
+    catalogs = {}
+    for language, data in raw.items():
+        merged = {}
+        for key, value in base.items():
+            override = data.get(key)
+            if key == 'venues':
+                merged[key] = {
+                    venue_id: {**fields, **(override or {}).get(venue_id, {})}
+                    for venue_id, fields in value.items()
+                }
+            elif isinstance(value, dict):
+                merged[key] = {**value, **(override or {})}
+            else:
+                merged[key] = override if override is not None else value
+        catalogs[language] = Catalog(language, merged)
+
+    logger.info(f"Загружены каталоги сообщений: {', '.join(sorted(catalogs))}")
+    return catalogs
+
+def catalog_fingerprint():
+    """Отпечаток файлов каталогов (меняется при любой правке текстов)"""
+    digest = hashlib.sha256()
+    for filename in sorted(os.listdir(LOCALES_DIR)):
+        if filename.endswith('.json'):
+            digest.update(filename.encode())
+            with open(os.path.join(LOCALES_DIR, filename), 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+CATALOGS = load_catalogs()
+CATALOG_FINGERPRINT = catalog_fingerprint()
+
+MENU_ACTIONS = ['datetime', 'weather', 'attractions', 'restaurants', 'hotels', 'shops', 'about']
+
+# Подписи кнопки "Начать" на всех языках
+START_LABELS = {catalog.buttons['start'].lower() for catalog in CATALOGS.values()}
+
+def match_trigger(text, language):
+    """Слово-триггер из каталога пользователя, иначе из языка по умолчанию"""
+    matched = CATALOGS[language].match_trigger(text)
+    if matched is None and language != DEFAULT_LANGUAGE:
+        matched = CATALOGS[DEFAULT_LANGUAGE].match_trigger(text)
+    return matched
+
+def user_language(user):
+    """Язык интерфейса по language_code пользователя"""
+    code = (getattr(user, 'language_code', None) or '').split('-')[0].lower()
+    return code if code in CATALOGS else DEFAULT_LANGUAGE
+
+ATTRACTIONS = [
+    {
+        'id': 'lenin_head',
+        'emoji': '🗿',
+        '2gis_url': 'https://go.2gis.com/WedTM',
+        'photo_url': 'https://github.com/Sergey200202/tg_bot/blob/main/Images/lenin_head.JPG?raw=true'
+    },
+    {
+        'id': 'ethno_museum',
+        'emoji': '🏕️',
+        '2gis_url': 'https://go.2gis.com/sHGKa',
+        'photo_url': 'https://github.com/Sergey200202/tg_bot/blob/main/Images/ethno_museum.JPG?raw=true'
+    },
+    {
+        'id': 'datsan',
+        'emoji': '🕌',
+        '2gis_url': 'https://go.2gis.com/quIAY',
+        'photo_url': 'https://github.com/Sergey200202/tg_bot/blob/main/Images/datsan.JPG?raw=true'
+    },
+    {
+        'id': 'opera_theater',
+        'emoji': '🎭',
+        '2gis_url': 'https://go.2gis.com/fqOTE',
+        'photo_url': 'https://github.com/Sergey200202/tg_bot/blob/main/Images/opera_theater.JPG?raw=true'
+    },
+    {
+        'id': 'revolution_square',
+        'emoji': '🏛️',
+        '2gis_url': 'https://go.2gis.com/pWgJs',
+        'photo_url': 'https://github.com/Sergey200202/tg_bot/blob/main/Images/revolution_square.JPG?raw=true'
+    },
+    {
+        'id': 'cathedral',
+        'emoji': '⛪',
+        '2gis_url': 'https://go.2gis.com/6mGEz',
+        'photo_url': 'https://github.com/Sergey200202/tg_bot/blob/main/Images/cathedral.JPG?raw=true'
+    }
+]
+
+RESTAURANTS = [
+    {'id': 'orda', 'emoji': '🍖', '2gis_url': 'https://go.2gis.com/uC9y3'},
+    {'id': 'voyage', 'emoji': '🥘', '2gis_url': 'https://go.2gis.com/UvPWv'},
+    {'id': 'tengis', 'emoji': '🐟', '2gis_url': 'https://go.2gis.com/bHxCi'},
+    {'id': 'gyoza', 'emoji': '🎤', '2gis_url': 'https://go.2gis.com/slkG4'},
+    {'id': 'sakhar', 'emoji': '🍷', '2gis_url': 'https://go.2gis.com/d5T1Y'}
+]
+
+HOTELS = [
+    {'id': 'cosmos', 'stars': '⭐⭐⭐⭐⭐', 'emoji': '🛌', '2gis_url': 'https://go.2gis.com/2moZG'},
+    {'id': 'sagaan_morin', 'stars': '⭐⭐⭐⭐', 'emoji': '💼', '2gis_url': 'https://go.2gis.com/szcW2'},
+    {'id': 'baikal_plaza', 'stars': '⭐⭐⭐⭐', 'emoji': '🌆', '2gis_url': 'https://go.2gis.com/THSet'},
+    {'id': 'city_park', 'stars': '⭐⭐⭐', 'emoji': '🌃', '2gis_url': 'https://go.2gis.com/oJuBA'},
+    {'id': 'buryatia', 'stars': '⭐⭐⭐', 'emoji': '🏨', '2gis_url': 'https://go.2gis.com/dEgnK'}
+]
+
+SHOPS = [
+    {'id': 'forum', 'emoji': '🏬', '2gis_url': 'https://go.2gis.com/B3laE'},
+    {'id': 'pioneer', 'emoji': '🎯', '2gis_url': 'https://go.2gis.com/q0dui'},
+    {'id': 'central_market', 'emoji': '🛒', '2gis_url': 'https://go.2gis.com/PmHDI'},
+    {'id': 'yubileyny', 'emoji': '🛠️', '2gis_url': 'https://go.2gis.com/2Ai6B'}
+]
+
+# Экран со списком мест: (шаблон одного пункта, данные)
+VENUE_SCREENS = {
+    'attractions': ('attraction_item', ATTRACTIONS),
+    'restaurants': ('restaurant_item', RESTAURANTS),
+    'hotels': ('hotel_item', HOTELS),
+    'shops': ('shop_item', SHOPS)
+}
+
+# Отрисованные статические экраны: "язык:экран" -> текст
+rendered_screens = {}
+
+def render_static_screen(language, name):
+    """Отрисовка статического экрана по каталогу"""
+    catalog = CATALOGS[language]
+    if name not in VENUE_SCREENS:
+        return catalog.render(name)
+
+    item_template, venues = VENUE_SCREENS[name]
+    items = []
+    for number, venue in enumerate(venues, 1):
+        values = {**venue, **catalog.venues[venue['id']]}
+        items.append(catalog.render(item_template, number=number, map_url=venue['2gis_url'], **values))
+    return catalog.render(name, items_html=''.join(items))
+
+def static_screen(language, name):
+    """Текст статического экрана (рендерится один раз на язык)"""
+    key = f"{language}:{name}"
+    text = rendered_screens.get(key)
+    if text is None:
+        text = render_static_screen(language, name)
+        rendered_screens[key] = text
+    return text
+
+@lru_cache(maxsize=None)
+def main_menu_keyboard(language):
+    """Инлайн-клавиатура главного меню"""
+    buttons = CATALOGS[language].buttons
+    keyboard = [[InlineKeyboardButton(buttons[action], callback_data=action)] for action in MENU_ACTIONS]
+    return InlineKeyboardMarkup(keyboard)
+
+@lru_cache(maxsize=None)
+def start_keyboard(language):
+    """Клавиатура с кнопкой 'Начать'"""
+    keyboard = [[KeyboardButton(CATALOGS[language].buttons['start'])]]
+    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True, one_time_keyboard=True)
+
+# Виды ошибок получения погоды; у каждого свой текст в каталоге (weather_error_<вид>)
+WEATHER_ERROR_KINDS = ['timeout', 'connection', 'format', 'unknown']
+
+STATIC_SCREENS = [
+    'welcome', 'main_menu', 'menu_again', 'action_error', 'unexpected_error', 'datetime_error',
+    *(f'weather_error_{kind}' for kind in WEATHER_ERROR_KINDS),
+    'about', 'fallback', 'info', 'help', *VENUE_SCREENS
+]
+
+def prerender_static_screens():
+    """Заранее отрисовать статические экраны и клавиатуры для всех языков"""
+    for language in CATALOGS:
+        for name in STATIC_SCREENS:
+            static_screen(language, name)
+        main_menu_keyboard(language)
+        start_keyboard(language)
+
+async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Обработчик команды /start"""
+    started = time.monotonic()
+    language = user_language(update.effective_user)
+    await update.message.reply_text(
+        static_screen(language, 'welcome'),
+        reply_markup=start_keyboard(language),
+        parse_mode='HTML'
+    )
+    analytics.record('start', update.effective_chat.id, time.monotonic() - started)
 
 async def handle_start_button(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработчик нажатия кнопки 'Начать'"""
     text = update.message.text
     
-    if text == "🚀 Начать":
-        await show_main_menu(update.message)
+    if text.lower() in START_LABELS:
+        await show_main_menu(update.message, user_language(update.effective_user))
 
-async def show_main_menu(message):
+async def show_main_menu(message, language):
     """Показать главное меню с инлайн-кнопками"""
-    keyboard = [
-        [InlineKeyboardButton("📅 Текущая дата и время", callback_data="datetime")],
-        [InlineKeyboardButton("🌤️ Погода сейчас", callback_data="weather")],
-        [InlineKeyboardButton("🏛️ Достопримечательности", callback_data="attractions")],
-        [InlineKeyboardButton("🍽️ Рестораны", callback_data="restaurants")],
-        [InlineKeyboardButton("🏨 Отели", callback_data="hotels")],
-        [InlineKeyboardButton("🛍️ Магазины", callback_data="shops")],
-        [InlineKeyboardButton("ℹ️ О городе", callback_data="about")],
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    text = "🏙️ Выбери, что хочешь узнать об Улан-Удэ:"
-    
-    await message.reply_text(text, reply_markup=reply_markup)
+    await message.reply_text(static_screen(language, 'main_menu'), reply_markup=main_menu_keyboard(language))
 
 async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработчик нажатия инлайн-кнопок"""
@@ -86,50 +574,43 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.answer()
     
     action = query.data
+    language = user_language(query.from_user)
+    started = time.monotonic()
+    provider = None
     
     try:
         if action == 'weather':
-            await show_weather(query)
+            provider = await show_weather(query, language)
         elif action == 'datetime':
-            await show_current_datetime(query)
+            await show_current_datetime(query, language)
         elif action == 'attractions':
-            await show_attractions(query)
+            await show_attractions(query, language)
         elif action == 'restaurants':
-            await show_restaurants(query)
+            await show_restaurants(query, language)
         elif action == 'hotels':
-            await show_hotels(query)
+            await show_hotels(query, language)
         elif action == 'shops':
-            await show_shops(query)
+            await show_shops(query, language)
         elif action == 'about':
-            await show_about(query)
+            await show_about(query, language)
         
         # После выполнения действия показываем меню снова
-        await show_main_menu_after_action(query)
+        await show_main_menu_after_action(query, language)
+        analytics.record(action, query.message.chat_id, time.monotonic() - started, provider)
         
     except Exception as e:
         logger.error(f"Error in button_handler: {e}")
-        await query.edit_message_text("❌ Произошла ошибка при обработке запроса. Попробуйте позже.")
+        await query.edit_message_text(static_screen(language, 'action_error'))
 
-async def show_main_menu_after_action(query):
+async def show_main_menu_after_action(query, language):
     """Показать главное меню после выполнения действия"""
-    keyboard = [
-        [InlineKeyboardButton("📅 Текущая дата и время", callback_data="datetime")],
-        [InlineKeyboardButton("🌤️ Погода сейчас", callback_data="weather")],
-        [InlineKeyboardButton("🏛️ Достопримечательности", callback_data="attractions")],
-        [InlineKeyboardButton("🍽️ Рестораны", callback_data="restaurants")],
-        [InlineKeyboardButton("🏨 Отели", callback_data="hotels")],
-        [InlineKeyboardButton("🛍️ Магазины", callback_data="shops")],
-        [InlineKeyboardButton("ℹ️ О городе", callback_data="about")],
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    text = "Что ещё хочешь узнать об Улан-Удэ?"
-    
-    await query.message.reply_text(text, reply_markup=reply_markup)
+    await query.message.reply_text(static_screen(language, 'menu_again'), reply_markup=main_menu_keyboard(language))
 
-def get_current_datetime_info():
+def get_current_datetime_info(language=DEFAULT_LANGUAGE):
     """Получение текущей даты и времени для Улан-Удэ"""
     try:
+        catalog = CATALOGS[language]
+
         # Улан-Удэ находится в часовом поясе UTC+8 (IRKT - Irkutsk Time)
         utc_offset = 8  # часовой пояс Улан-Удэ
         
@@ -142,47 +623,20 @@ def get_current_datetime_info():
         # Форматирование даты и времени
         current_date = ulan_ude_time.strftime('%d.%m.%Y')
         current_time = ulan_ude_time.strftime('%H:%M:%S')
-        day_of_week = ulan_ude_time.strftime('%A')
-        
-        # Русские названия дней недели
-        days_russian = {
-            'Monday': 'Понедельник',
-            'Tuesday': 'Вторник',
-            'Wednesday': 'Среда',
-            'Thursday': 'Четверг',
-            'Friday': 'Пятница',
-            'Saturday': 'Суббота',
-            'Sunday': 'Воскресенье'
-        }
         
-        # Русские названия месяцев
-        months_russian = {
-            'January': 'января',
-            'February': 'февраля',
-            'March': 'марта',
-            'April': 'апреля',
-            'May': 'мая',
-            'June': 'июня',
-            'July': 'июля',
-            'August': 'августа',
-            'September': 'сентября',
-            'October': 'октября',
-            'November': 'ноября',
-            'December': 'декабря'
-        }
-        
-        day_name_ru = days_russian.get(day_of_week, day_of_week)
-        month_name_ru = months_russian.get(ulan_ude_time.strftime('%B'), ulan_ude_time.strftime('%B'))
+        # Названия дней недели и месяцев на языке пользователя
+        day_name = catalog.days[ulan_ude_time.weekday()]
+        month_name = catalog.months[ulan_ude_time.month - 1]
         
         # Красивое форматирование даты
-        beautiful_date = f"{ulan_ude_time.day} {month_name_ru} {ulan_ude_time.year}"
+        beautiful_date = catalog.render('date', day=ulan_ude_time.day, month=month_name, year=ulan_ude_time.year)
         
         datetime_info = {
             'city': 'Улан-Удэ',
             'timezone': 'IRKT (UTC+8)',
             'current_date': current_date,
             'current_time': current_time,
-            'day_of_week': day_name_ru,
+            'day_of_week': day_name,
             'beautiful_date': beautiful_date,
             'timestamp': ulan_ude_time.timestamp(),
             'day_number': ulan_ude_time.day,
@@ -198,65 +652,61 @@ def get_current_datetime_info():
     except Exception as e:
         return None, f"Ошибка получения времени: {str(e)}"
 
-async def show_current_datetime(query):
+async def show_current_datetime(query, language):
     """Показать текущую дату и время в Улан-Удэ"""
-    datetime_info, error = get_current_datetime_info()
+    catalog = CATALOGS[language]
+    datetime_info, error = get_current_datetime_info(language)
     
     if error:
         logger.error(f"Datetime error: {error}")
-        await query.edit_message_text(f"❌ {error}")
+        await query.edit_message_text(static_screen(language, 'datetime_error'), parse_mode='HTML')
         return
     
     # Определяем приветствие по времени суток
     hour = datetime_info['hour']
     if 5 <= hour < 12:
-        greeting = "🌅 Доброе утро!"
+        greeting = catalog.greetings['morning']
         time_emoji = "🌄"
     elif 12 <= hour < 18:
-        greeting = "☀️ Добрый день!"
+        greeting = catalog.greetings['day']
         time_emoji = "🏙️"
     elif 18 <= hour < 23:
-        greeting = "🌇 Добрый вечер!"
+        greeting = catalog.greetings['evening']
         time_emoji = "🌆"
     else:
-        greeting = "🌙 Доброй ночи!"
+        greeting = catalog.greetings['night']
         time_emoji = "🌃"
     
     # Определяем сезон по месяцу
     month = datetime_info['month_number']
     if month in [12, 1, 2]:
         season_emoji = "❄️"
-        season_text = "зима"
+        season_text = catalog.seasons['winter']
     elif month in [3, 4, 5]:
         season_emoji = "🌱"
-        season_text = "весна"
+        season_text = catalog.seasons['spring']
     elif month in [6, 7, 8]:
         season_emoji = "☀️"
-        season_text = "лето"
+        season_text = catalog.seasons['summer']
     else:
         season_emoji = "🍂"
-        season_text = "осень"
+        season_text = catalog.seasons['autumn']
     
-    response_text = f"""
-{time_emoji} *Текущая дата и время в Улан-Удэ*
-
-{greeting}
-
-📅 *Дата:* {datetime_info['beautiful_date']}
-🕐 *Время:* {datetime_info['current_time']}
-📆 *День недели:* {datetime_info['day_of_week']}
-🌍 *Часовой пояс:* {datetime_info['timezone']}
-{season_emoji} *Сезон:* {season_text}
-
-*Интересные факты о времени в Улан-Удэ:*
-• ⏰ Город находится в одном часовом поясе с Иркутском
-• 🌞 Разница с Москвой: +5 часов
-• 🗓️ Сегодня {datetime_info['day_number']}-й день месяца
-• 📊 Текущий год: {datetime_info['year']}
-
-*Обновлено:* {datetime.utcnow().strftime('%H:%M:%S')} UTC
-    """
-    await query.edit_message_text(response_text, parse_mode='Markdown')
+    response_text = catalog.render(
+        'datetime',
+        time_emoji=time_emoji,
+        greeting=greeting,
+        date_html=datetime_info['beautiful_date'],
+        time=datetime_info['current_time'],
+        weekday=datetime_info['day_of_week'],
+        timezone=datetime_info['timezone'],
+        season_emoji=season_emoji,
+        season=season_text,
+        day=datetime_info['day_number'],
+        year=datetime_info['year'],
+        updated=datetime.utcnow().strftime('%H:%M:%S')
+    )
+    await query.edit_message_text(response_text, parse_mode='HTML')
 
 def format_time(time_str):
     """Форматирование времени"""
@@ -268,6 +718,68 @@ def format_time(time_str):
     except Exception:
         return time_str
 
+class SingleFlight:
+    """Объединение одновременных одинаковых запросов к внешним API.
+
+    Пока запрос по ключу выполняется, остальные вызовы с тем же ключом
+    не идут во внешний сервис, а ждут его результат (или ошибку).
+    """
+
+    def __init__(self):
+        self._in_flight = {}
+        self.stats = {}
+
+    async def do(self, key, func, *args):
+        """Выполнить func(*args) в отдельном потоке, объединяя вызовы по ключу"""
+        key_stats = self.stats.setdefault(key, {'calls': 0, 'flights': 0, 'shared': 0, 'max_fan_in': 0})
+        key_stats['calls'] += 1
+
+        flight = self._in_flight.get(key)
+        if flight is None:
+            # Запрос выполняется отдельной задачей: отмена любого из ожидающих
+            # (в том числе первого) не обрывает его для остальных
+            task = asyncio.ensure_future(asyncio.to_thread(func, *args))
+            flight = {'task': task, 'waiters': 0}
+            self._in_flight[key] = flight
+            key_stats['flights'] += 1
+            task.add_done_callback(lambda _: self._finish(key, flight))
+        else:
+            key_stats['shared'] += 1
+
+        flight['waiters'] += 1
+        return await asyncio.shield(flight['task'])
+
+    def _finish(self, key, flight):
+        """Снять завершённый запрос и записать статистику"""
+        if self._in_flight.get(key) is flight:
+            del self._in_flight[key]
+        key_stats = self.stats[key]
+        key_stats['max_fan_in'] = max(key_stats['max_fan_in'], flight['waiters'])
+        if flight['waiters'] > 1:
+            logger.info(f"Single-flight '{key}': {flight['waiters']} запросов объединены в один")
+        task = flight['task']
+        if not task.cancelled():
+            # Ожидающих могло не остаться, помечаем ошибку обработанной
+            task.exception()
+
+    def get_stats(self):
+        """Статистика объединения запросов по ключам"""
+        return {key: dict(value) for key, value in self.stats.items()}
+
+upstream_flights = SingleFlight()
+
+# Последние данные о погоде; fetched_at - время получения (epoch), переживает перезапуск через снимок
+weather_cache = {'data': None, 'fetched_at': 0.0}
+
+# file_id загруженных в Telegram фото альбома: URL -> file_id
+photo_file_ids = {}
+
+# Общий для воркеров кэш и блокировка (в однопроцессном режиме не используются)
+shared_cache = None
+shared_lock = None
+# Ошибки прокси Manager, когда процесс-брокер завершился
+SHARED_STATE_ERRORS = (EOFError, OSError)
+
 @lru_cache(maxsize=1)
 def get_weather_cached(api_type: str, cache_timeout=300):
     """Кэширование запросов погоды"""
@@ -304,13 +816,16 @@ def get_weather_visual_crossing():
         return weather_info, None
         
     except requests.exceptions.Timeout:
-        return None, "Таймаут при получении данных о погоде"
+        return None, 'timeout'
     except requests.exceptions.RequestException as e:
-        return None, f"Ошибка соединения: {str(e)}"
+        logger.warning(f"Visual Crossing: ошибка соединения: {e}")
+        return None, 'connection'
     except KeyError as e:
-        return None, f"Неожиданный формат данных: {str(e)}"
+        logger.warning(f"Visual Crossing: неожиданный формат данных: {e}")
+        return None, 'format'
     except Exception as e:
-        return None, f"Ошибка получения погоды: {str(e)}"
+        logger.warning(f"Visual Crossing: ошибка получения погоды: {e}")
+        return None, 'unknown'
 
 def get_weather_weatherapi():
     """Получение погоды через WeatherAPI"""
@@ -340,28 +855,134 @@ def get_weather_weatherapi():
         return weather_info, None
         
     except requests.exceptions.Timeout:
-        return None, "Таймаут при получении данных о погоде"
+        return None, 'timeout'
     except requests.exceptions.RequestException as e:
-        return None, f"Ошибка соединения: {str(e)}"
+        logger.warning(f"WeatherAPI: ошибка соединения: {e}")
+        return None, 'connection'
     except KeyError as e:
-        return None, f"Неожиданный формат данных: {str(e)}"
+        logger.warning(f"WeatherAPI: неожиданный формат данных: {e}")
+        return None, 'format'
     except Exception as e:
-        return None, f"Ошибка получения погоды: {str(e)}"
+        logger.warning(f"WeatherAPI: ошибка получения погоды: {e}")
+        return None, 'unknown'
 
-async def show_weather(query):
-    """Показать текущую погоду"""
+def fetch_weather():
+    """Получение погоды с переключением на запасной источник"""
     # Пробуем разные источники погоды
     weather_info, error = get_weather_visual_crossing()
+    provider = 'visual_crossing'
     
     if error:
         logger.warning(f"Visual Crossing API failed: {error}")
         weather_info, error = get_weather_weatherapi()
+        provider = 'weatherapi'
+    
+    if weather_info:
+        weather_info['provider'] = provider
+    return weather_info, error
+
+def fetch_weather_entry():
+    """Запись кэша погоды: данные и время получения"""
+    weather_info, error = fetch_weather()
+    if error:
+        return None, error
+    return {'data': weather_info, 'fetched_at': time.time()}, None
+
+def take_weather_lease():
+    """Свежая запись из общего кэша либо аренда на запрос к API.
+
+    Возвращает (entry, None), если погода в общем кэше свежая, и (None, lease),
+    если запрос достался этому воркеру. (None, None) - блокировку взять не
+    удалось или чужая аренда держится слишком долго: погоду нужно запросить самому.
+    """
+    deadline = time.time() + 2 * WEATHER_FETCH_LEASE
+    while time.time() < deadline:
+        if not shared_lock.acquire(timeout=SHARED_LOCK_TIMEOUT):
+            logger.warning("Общая блокировка недоступна, запрашиваем погоду без общего кэша")
+            return None, None
+        try:
+            now = time.time()
+            entry = shared_cache.get('weather')
+            if entry and now - entry['fetched_at'] < WEATHER_CACHE_TTL:
+                return entry, None
+            until, _ = shared_cache.get('weather_lease', (0, None))
+            if until < now:
+                lease = (now + WEATHER_FETCH_LEASE, secrets.token_hex(8))
+                shared_cache['weather_lease'] = lease
+                return None, lease
+        finally:
+            shared_lock.release()
+        time.sleep(0.2)
+    return None, None
+
+def release_weather_lease(lease, entry):
+    """Сохранить полученную погоду и снять аренду, если она всё ещё наша"""
+    if entry:
+        shared_cache['weather'] = entry
+    if not shared_lock.acquire(timeout=SHARED_LOCK_TIMEOUT):
+        return  # аренда истечёт сама
+    try:
+        # Просроченную аренду мог уже забрать другой воркер: её не трогаем
+        if shared_cache.get('weather_lease') == lease:
+            shared_cache['weather_lease'] = (0, None)
+    finally:
+        shared_lock.release()
+
+def fetch_weather_shared():
+    """Погода через общий кэш воркеров: в API ходит только один процесс.
+
+    Блокировка берётся лишь на проверку кэша и захват аренды (weather_lease),
+    сам запрос к API идёт без неё. Если воркер упал во время запроса, аренда
+    истекает через WEATHER_FETCH_LEASE секунд и запрос берёт другой воркер.
+    Если недоступен сам брокер общего кэша, погода запрашивается локально.
+    """
+    try:
+        entry, lease = take_weather_lease()
+    except SHARED_STATE_ERRORS as e:
+        logger.warning(f"Общий кэш воркеров недоступен ({e!r}), запрашиваем погоду без него")
+        return fetch_weather_entry()
+    if entry:
+        return entry, None
+    if lease is None:
+        return fetch_weather_entry()
+
+    entry = None
+    try:
+        entry, error = fetch_weather_entry()
+        return entry, error
+    finally:
+        try:
+            release_weather_lease(lease, entry)
+        except SHARED_STATE_ERRORS as e:
+            logger.warning(f"Общий кэш воркеров недоступен ({e!r}), погода не сохранена")
+
+async def get_weather():
+    """Погода с кэшем на WEATHER_CACHE_TTL секунд"""
+    if weather_cache['data'] and time.time() - weather_cache['fetched_at'] < WEATHER_CACHE_TTL:
+        return weather_cache['data'], None
+
+    # Одновременные запросы после истечения кэша разделяют один запрос к API
+    fetch = fetch_weather_shared if shared_cache is not None else fetch_weather_entry
+    entry, error = await upstream_flights.do('weather:ulan-ude', fetch)
+    if error:
+        return None, error
+
+    weather_cache.update(entry)
+    return entry['data'], None
+
+async def show_weather(query, language):
+    """Показать текущую погоду"""
+    catalog = CATALOGS[language]
+
+    weather_info, error = await get_weather()
     
     if error:
         logger.error(f"Weather API failed: {error}")
-        await query.edit_message_text(f"❌ {error}")
+        await query.edit_message_text(static_screen(language, f'weather_error_{error}'), parse_mode='HTML')
         return
     
+    # Описание погоды приходит от API на русском (lang=ru): по нему выбирается
+    # эмодзи, а показывается оно только в каталогах со строкой {description}
     weather_emojis = {
         "ясно": "☀️", "солнечно": "☀️", "облачно": "☁️", "пасмурно": "☁️",
         "дождь": "🌧️", "снег": "❄️", "гроза": "⛈️", "туман": "🌫️",
@@ -378,106 +999,48 @@ async def show_weather(query):
     # Форматируем время восхода и заката, если есть
     sunrise_sunset = ""
     if 'sunrise' in weather_info and weather_info['sunrise'] != 'N/A':
-        sunrise_sunset = f"🌅 Восход: {weather_info['sunrise']}\n🌇 Закат: {weather_info['sunset']}\n"
+        sunrise_sunset = catalog.render('weather_sun', sunrise=weather_info['sunrise'], sunset=weather_info['sunset'])
     
-    response_text = f"""
-{emoji} *Погода в Улан-Удэ сейчас*
-
-🌡️ Температура: *{weather_info['temp']}°C*
-💭 Ощущается как: *{weather_info['feels_like']}°C*
-📝 *{weather_info['description']}*
-💧 Влажность: *{weather_info['humidity']}%*
-📊 Давление: *{weather_info['pressure']} гПа*
-💨 Ветер: *{weather_info['wind_speed']} м/с*
-👁️ Видимость: *{weather_info['visibility']} км*
-☀️ УФ-индекс: *{weather_info['uv_index']}*
-
-{sunrise_sunset}
-*Обновлено:* {datetime.now().strftime('%H:%M')}
-    """
-    await query.edit_message_text(response_text, parse_mode='Markdown')
+    response_text = catalog.render(
+        'weather',
+        emoji=emoji,
+        temp=weather_info['temp'],
+        feels_like=weather_info['feels_like'],
+        description=weather_info['description'],
+        humidity=weather_info['humidity'],
+        pressure=weather_info['pressure'],
+        wind_speed=weather_info['wind_speed'],
+        visibility=weather_info['visibility'],
+        uv_index=weather_info['uv_index'],
+        sun_html=sunrise_sunset,
+        updated=datetime.now().strftime('%H:%M')
+    )
+    await query.edit_message_text(response_text, parse_mode='HTML')
+    return weather_info['provider']
 
-async def show_attractions(query):
+async def show_attractions(query, language):
     """Показать достопримечательности в виде альбома с фото по URL"""
-    
-    # Описание достопримечательностей
-    attractions = [
-        {
-            'name': 'Памятник Ленину (Голова Ленина)',
-            'description': 'Самая большая голова Ленина в мире - визитная карточка города',
-            'address': 'пл. Советов',
-            'emoji': '🗿',
-            '2gis_url': 'https://go.2gis.com/WedTM',
-            'photo_url': 'https://github.com/Sergey200202/tg_bot/blob/main/Images/lenin_head.JPG?raw=true'  
-        },
-        {
-            'name': 'Этнографический музей народов Забайкалья',
-            'description': 'Музей под открытым небом с традиционными бурятскими жилищами',
-            'address': 'пос. Верхняя Берёзовка, 17Б',
-            'emoji': '🏕️',
-            '2gis_url': 'https://go.2gis.com/sHGKa',
-            'photo_url': 'https://github.com/Sergey200202/tg_bot/blob/main/Images/ethno_museum.JPG?raw=true'  
-        },
-        {
-            'name': 'Иволгинский дацан',
-            'description': 'Центр буддизма в России, резиденция Пандито Хамбо-ламы',
-            'address': 'с. Верхняя Иволга (40 км от города)',
-            'emoji': '🕌',
-            '2gis_url': 'https://go.2gis.com/quIAY',
-            'photo_url': 'https://github.com/Sergey200202/tg_bot/blob/main/Images/datsan.JPG?raw=true'  
-        },
-        {
-            'name': 'Театр оперы и балета',
-            'description': 'Красивейшее здание в национальном стиле',
-            'address': 'ул. Ленина, 51',
-            'emoji': '🎭',
-            '2gis_url': 'https://go.2gis.com/fqOTE',
-            'photo_url': 'https://github.com/Sergey200202/tg_bot/blob/main/Images/opera_theater.JPG?raw=true'  
-        },
-        {
-            'name': 'Площадь Революции',
-            'description': 'Исторический центр города с фонтанами и сквером',
-            'address': 'пл. Революции',
-            'emoji': '🏛️',
-            '2gis_url': 'https://go.2gis.com/pWgJs',
-            'photo_url': 'https://github.com/Sergey200202/tg_bot/blob/main/Images/revolution_square.JPG?raw=true' 
-        },
-        {
-            'name': 'Свято-Одигитриевский собор',
-            'description': 'Первый каменный храм в Забайкалье',
-            'address': 'ул. Ленина, 2',
-            'emoji': '⛪',
-            '2gis_url': 'https://go.2gis.com/6mGEz',
-            'photo_url': 'https://github.com/Sergey200202/tg_bot/blob/main/Images/cathedral.JPG?raw=true'  
-        }
-    ]
-    
-    # Формируем общую подпись
-    caption = "🏛️ *Главные достопримечательности Улан-Удэ:*\n\n"
-    
-    for i, attr in enumerate(attractions, 1):
-        caption += f"{i}. {attr['emoji']} *{attr['name']}*\n"
-        caption += f"   📍 {attr['address']}\n"
-        caption += f"   ℹ️ {attr['description']}\n"
-        caption += f"   🗺️ [Открыть в 2ГИС]({attr['2gis_url']})\n\n"
+    caption = static_screen(language, 'attractions')
     
     # Создаем медиа-группу для альбома
     media_group = []
     
     # Для первого фото добавляем подпись, для остальных - только фото
-    for i, attr in enumerate(attractions):
+    # Уже загруженные фото отправляем по file_id, без повторной загрузки по URL
+    for i, attr in enumerate(ATTRACTIONS):
+        media = photo_file_ids.get(attr['photo_url'], attr['photo_url'])
         if i == 0:
             media_group.append(
                 InputMediaPhoto(
-                    media=attr['photo_url'],
+                    media=media,
                     caption=caption,
-                    parse_mode='Markdown'
+                    parse_mode='HTML'
                 )
             )
         else:
             media_group.append(
                 InputMediaPhoto(
-                    media=attr['photo_url']
+                    media=media
                 )
             )
     
@@ -486,291 +1049,315 @@ async def show_attractions(query):
         await query.message.delete()
         
         # Отправляем альбом
-        await query.message.reply_media_group(media=media_group)
+        messages = await query.message.reply_media_group(media=media_group)
+        
+        for attr, sent in zip(ATTRACTIONS, messages):
+            if sent.photo:
+                photo_file_ids[attr['photo_url']] = sent.photo[-1].file_id
         
     except Exception as e:
         logger.error(f"Error sending photo album: {e}")
+        # file_id могли устареть - в следующий раз отправим по URL
+        photo_file_ids.clear()
         # Если не удалось отправить альбом, отправляем текстовую версию
-        await query.message.reply_text(caption, parse_mode='Markdown', disable_web_page_preview=True)
+        await query.message.reply_text(caption, parse_mode='HTML', disable_web_page_preview=True)
 
-async def show_restaurants(query):
+async def show_restaurants(query, language):
     """Показать рестораны"""
-    restaurants = [
-        {
-            'name': 'Этноресторан "Орда"',
-            'cuisine': 'Бурятская, азиатская',
-            'address': 'ул. Пушкина, 4а',
-            'specialty': 'Традиционные бурятские блюда',
-            'emoji': '🍖',
-            '2gis_url': 'https://go.2gis.com/uC9y3'
-        },
-        {
-            'name': 'Гурмэ-ресторан "Voyage"',
-            'cuisine': 'Мировая',
-            'address': 'ул. Ранжурова, 11',
-            'specialty': 'Мировые блюда',
-            'emoji': '🥘',
-            '2gis_url': 'https://go.2gis.com/UvPWv'
-        },
-        {
-            'name': 'Ресторан "Тэнгис"',
-            'cuisine': 'Бурятская, паназиатская',
-            'address': 'ул. Ербанова, 12',
-            'specialty': 'Блюда из морепродуктов',
-            'emoji': '🐟',
-            '2gis_url': 'https://go.2gis.com/bHxCi'
-        },
-        {
-            'name': 'Ресторан-бар "Гёдзе"',
-            'cuisine': 'Паназиатская',
-            'address': 'ул. Свободы, 15',
-            'specialty': 'Караоке кабинки',
-            'emoji': '🎤',
-            '2gis_url': 'https://go.2gis.com/slkG4'
-        },
-        {
-            'name': 'Ресторан-бар "Сахар"',
-            'cuisine': 'Итальянская, средиземноморская',
-            'address': 'ул. Сухэ-Батора, 7',
-            'specialty': 'Блюда в аутентичной атмосфере',
-            'emoji': '🍷',
-            '2gis_url': 'https://go.2gis.com/d5T1Y'
-        }
-    ]
-    
-    response_text = "🍽️ *Лучшие рестораны Улан-Удэ:*\n\n"
-    
-    for i, rest in enumerate(restaurants, 1):
-        response_text += f"{i}. {rest['emoji']} *{rest['name']}*\n"
-        response_text += f"   📍 {rest['address']}\n"
-        response_text += f"   🍳 {rest['cuisine']}\n"
-        response_text += f"   👑 {rest['specialty']}\n"
-        response_text += f"   🗺️ [Открыть в 2ГИС]({rest['2gis_url']})\n\n"
-    
-    await query.edit_message_text(response_text, parse_mode='Markdown', disable_web_page_preview=True)
+    await query.edit_message_text(static_screen(language, 'restaurants'), parse_mode='HTML', disable_web_page_preview=True)
 
-async def show_hotels(query):
+async def show_hotels(query, language):
     """Показать отели"""
-    hotels = [
-        {
-            'name': 'Отель "Cosmos Selection Ulan-Ude"',
-            'stars': '⭐⭐⭐⭐⭐',
-            'address': 'ул. Борсоева, 19б',
-            'features': 'SPA, парковка, завтрак включен',
-            'price': 'от 6200 руб/ночь',
-            'emoji': '🛌',
-            '2gis_url': 'https://go.2gis.com/2moZG'
-        },
-        {
-            'name': 'Гостиница "Сагаан Морин"',
-            'stars': '⭐⭐⭐⭐',
-            'address': 'ул. Гагарина, 25б',
-            'features': 'Бизнес-центр, конференц-зал',
-            'price': 'от 4950 руб/ночь',
-            'emoji': '💼',
-            '2gis_url': 'https://go.2gis.com/szcW2'
-        },
-        {
-            'name': 'Отель "Байкал Плаза"',
-            'stars': '⭐⭐⭐⭐',
-            'address': 'ул. Ербанова, 12',
-            'features': 'Центр города, вид на город',
-            'price': 'от 3500 руб/ночь',
-            'emoji': '🌆',
-            '2gis_url': 'https://go.2gis.com/THSet'
-        },
-        {
-            'name': 'Отель "City Park"',
-            'stars': '⭐⭐⭐',
-            'address': 'ул. Октябрьская, 2б',
-            'features': 'SPA, парковка, конференц-залы',
-            'price': 'от 3000 руб/ночь',
-            'emoji': '🌃',
-            '2gis_url': 'https://go.2gis.com/oJuBA'
-        },
-        {
-            'name': 'Гостиница "Бурятия"',
-            'stars': '⭐⭐⭐',
-            'address': 'ул. Коммунистическая, 47а',
-            'features': 'Сауна, ресторан, Wi-Fi',
-            'price': 'от 2900 руб/ночь',
-            'emoji': '🏨',
-            '2gis_url': 'https://go.2gis.com/dEgnK'
-        },
-    ]
-    
-    response_text = "🏨 *Отели Улан-Удэ:*\n\n"
-    
-    for i, hotel in enumerate(hotels, 1):
-        response_text += f"{i}. {hotel['emoji']} *{hotel['name']}*\n"
-        response_text += f"   {hotel['stars']}\n"
-        response_text += f"   📍 {hotel['address']}\n"
-        response_text += f"   🎯 {hotel['features']}\n"
-        response_text += f"   💰 {hotel['price']}\n"
-        response_text += f"   🗺️ [Открыть в 2ГИС]({hotel['2gis_url']})\n\n"
-    
-    await query.edit_message_text(response_text, parse_mode='Markdown', disable_web_page_preview=True)
+    await query.edit_message_text(static_screen(language, 'hotels'), parse_mode='HTML', disable_web_page_preview=True)
 
-async def show_shops(query):
+async def show_shops(query, language):
     """Показать магазины"""
-    shops = [
-        {
-            'name': 'ТЦ "Форум"',
-            'type': 'Крупнейший торговый центр',
-            'address': 'ул. Ленина, 39',
-            'features': '200+ магазинов, фудкорт, кинотеатр',
-            'emoji': '🏬',
-            '2gis_url': 'https://go.2gis.com/B3laE'
-        },
-        {
-            'name': 'ТРЦ "Пионер"',
-            'type': 'Торгово-развлекательный центр',
-            'address': 'ул. Корабельная, 41',
-            'features': 'Магазины, кафе, развлечения',
-            'emoji': '🎯',
-            '2gis_url': 'https://go.2gis.com/q0dui'
-        },
-        {
-            'name': 'Рынок "Центральный"',
-            'type': 'Продуктовый рынок',
-            'address': 'ул. Балтахинова, 9',
-            'features': 'Свежие продукты, сувениры',
-            'emoji': '🛒',
-            '2gis_url': 'https://go.2gis.com/PmHDI'
-        },
-        {
-            'name': 'ТД "Юбилейный"',
-            'type': 'Торговый дом',
-            'address': 'ул. Гагарина, 24',
-            'features': 'Хоз. товары',
-            'emoji': '🛠️',
-            '2gis_url': 'https://go.2gis.com/2Ai6B'
-        }
-    ]
-    
-    response_text = "🛍️ *Магазины и ТЦ Улан-Удэ:*\n\n"
-    
-    for i, shop in enumerate(shops, 1):
-        response_text += f"{i}. {shop['emoji']} *{shop['name']}*\n"
-        response_text += f"   🏬 {shop['type']}\n"
-        response_text += f"   📍 {shop['address']}\n"
-        response_text += f"   🎯 {shop['features']}\n"
-        response_text += f"   🗺️ [Открыть в 2ГИС]({shop['2gis_url']})\n\n"
-    
-    await query.edit_message_text(response_text, parse_mode='Markdown', disable_web_page_preview=True)
+    await query.edit_message_text(static_screen(language, 'shops'), parse_mode='HTML', disable_web_page_preview=True)
 
-async def show_about(query):
+async def show_about(query, language):
     """Показать информацию о городе"""
-    about_text = """
-🏙️ *Улан-Удэ - столица Бурятии*
-
-*Основная информация:*
-• 📍 Расположение: Восточная Сибирь, в 100 км от Байкала
-• 👥 Население: ~437,000 человек
-• 🗓️ Основан: 1666 год
-• 🌆 Статус: Столица Республики Бурятия
-
-*Интересные факты:*
-• 🗿 Имеет самую большую скульптуру головы Ленина в мире
-• 🕌 Крупный центр буддизма в России
-• 🌍 Единственный город, где представлены 3 мировые религии: православие, буддизм и ислам
-• 🏔️ Расположен в долине рек Селенга и Уда
-
-*Климат:*
-• ❄️ Резко континентальный климат
-• 🌡️ Средняя температура января: -25°C
-• 🌡️ Средняя температура июля: +20°C
-• ☀️ Более 260 солнечных дней в году
-
-*Культура:*
-• 🎭 Известен Театром оперы и балета
-• 🥟 Родина знаменитых бурятских поз (бууз)
-• 🎪 Центр бурятской национальной культуры
-
-*Туризм:*
-• 🚗 Ворота к озеру Байкал
-• 🏕️ Богатая этнографическая культура
-• 🍖 Уникальная бурятская кухня
-• 🛕 Буддийские дацаны и монастыри
-    """
-    await query.edit_message_text(about_text, parse_mode='Markdown')
+    await query.edit_message_text(static_screen(language, 'about'), parse_mode='HTML')
 
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработка текстовых сообщений"""
+    started = time.monotonic()
+    language = user_language(update.effective_user)
     text = update.message.text.lower()
     
-    triggers = ['улан', 'улан-удэ', 'уланудэ', 'бурятия', 'погода', 'меню', 
-                'байкал', 'сибирь', 'город', 'гид', 'путеводитель', 'что посмотреть',
-                'время', 'дата', 'сколько время', 'который час']
+    matched = match_trigger(text, language)
     
-    if text == "🚀 начать":
-        await show_main_menu(update.message)
-    elif any(trigger in text for trigger in triggers):
-        await show_main_menu(update.message)
+    if text in START_LABELS:
+        await show_main_menu(update.message, language)
+    elif matched:
+        await show_main_menu(update.message, language)
     else:
-        response = """
-🏙️ Привет! Я бот-гид по Улан-Удэ.
-
-Я специализируюсь только на столице Бурятии. Нажми кнопку *"🚀 Начать"* или используй команду /start чтобы открыть меню и узнать всё об этом замечательном городе!
-
-*Интересные факты об Улан-Удэ:*
-• Город основан в 1666 году
-• Здесь находится самая большая голова Ленина в мире
-• Столица буддизма в России
-• Более 260 солнечных дней в году
-        """
-        await update.message.reply_text(response, parse_mode='Markdown')
+        await update.message.reply_text(static_screen(language, 'fallback'), parse_mode='HTML')
+    
+    # Сохраняем только известные слова-триггеры, сам текст пользователя не пишем
+    term = matched or 'other'
+    analytics.record('text', update.effective_chat.id, time.monotonic() - started, term=term)
 
 async def info_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Команда /info"""
-    help_text = """
-🏙️ *Бот-гид по Улан-Удэ - Справка*
-
-*Доступные команды:*
-/start - Главное меню с кнопкой "Начать"
-/info - Эта справка
-/help - Помощь
-
-*Я могу рассказать о:*
-• 📅 Текущей дате и времени в Улан-Удэ
-• 🌤️ Текущей погоде в Улан-Удэ
-• 🏛️ Главных достопримечательностях
-• 🍽️ Лучших ресторанах и кафе
-• 🏨 Гостиницах и отелях
-• 🛍️ Магазинах и ТЦ
-• ℹ️ Интересных фактах о городе
-
-*Нажми "🚀 Начать" чтобы открыть меню!*
-    """
-    await update.message.reply_text(help_text, parse_mode='Markdown')
+    started = time.monotonic()
+    language = user_language(update.effective_user)
+    await update.message.reply_text(static_screen(language, 'info'), parse_mode='HTML')
+    analytics.record('info', update.effective_chat.id, time.monotonic() - started)
 
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Команда /help"""
-    help_text = """
-🤖 *Доступные команды:*
-/start - Начать работу с ботом
-/info - Информация о боте
-/help - Эта справка
-
-Просто напишите название города или нажмите кнопку "🚀 Начать"!
-    """
-    await update.message.reply_text(help_text, parse_mode='Markdown')
+    started = time.monotonic()
+    language = user_language(update.effective_user)
+    await update.message.reply_text(static_screen(language, 'help'), parse_mode='HTML')
+    analytics.record('help', update.effective_chat.id, time.monotonic() - started)
 
 async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработчик ошибок"""
     logger.error(f"Exception while handling an update: {context.error}")
     
-    if update and update.effective_message:
+    if isinstance(update, Update) and update.effective_message:
         try:
             await update.effective_message.reply_text(
-                "❌ Произошла непредвиденная ошибка. Пожалуйста, попробуйте позже."
+                static_screen(user_language(update.effective_user), 'unexpected_error')
             )
         except Exception as e:
             logger.error(f"Error in error handler: {e}")
 
-def main():
-    """Основная функция"""
-    application = Application.builder().token(TOKEN).build()
+class InstrumentedRequest(HTTPXRequest):
+    """HTTP-транспорт Bot API с учётом ожидания свободного соединения в пуле.
+
+    Число одновременных запросов ограничено размером пула, поэтому время
+    ожидания слота равно времени ожидания свободного соединения.
+    """
+
+    def __init__(self, name, connection_pool_size, pool_timeout, **kwargs):
+        super().__init__(connection_pool_size=connection_pool_size, pool_timeout=pool_timeout, **kwargs)
+        self.name = name
+        self.pool_size = connection_pool_size
+        self.pool_timeout = pool_timeout
+        self._slots = asyncio.Semaphore(connection_pool_size)
+        self.stats = {
+            'requests': 0,
+            'waited': 0,
+            'saturated': 0,
+            'pool_timeouts': 0,
+            'total_wait': 0.0,
+            'max_wait': 0.0,
+            'in_use': 0,
+            'peak_in_use': 0,
+        }
+
+    async def do_request(self, *args, pool_timeout=HTTPXRequest.DEFAULT_NONE, **kwargs):
+        """Выполнить запрос, замерив ожидание свободного соединения"""
+        # Явно переданный таймаут (в том числе None - ждать без ограничения)
+        # важнее настроенного
+        timeout = self.pool_timeout if pool_timeout is self.DEFAULT_NONE else pool_timeout
+
+        stats = self.stats
+        stats['requests'] += 1
+
+        wait_started = time.monotonic()
+        if self._slots.locked():
+            # Свободного слота нет уже в момент запроса: пул насыщен
+            stats['saturated'] += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=timeout)
+            except asyncio.TimeoutError:
+                stats['pool_timeouts'] += 1
+                raise TimedOut(f"Пул соединений '{self.name}' занят дольше {timeout} с")
+        else:
+            # Свободный слот занимается сразу, без переключения задач,
+            # иначе одновременные запросы не увидят, что пул уже занят
+            await self._slots.acquire()
+
+        waited = time.monotonic() - wait_started
+        stats['total_wait'] += waited
+        stats['max_wait'] = max(stats['max_wait'], waited)
+        if waited > 0.001:
+            stats['waited'] += 1
+
+        stats['in_use'] += 1
+        stats['peak_in_use'] = max(stats['peak_in_use'], stats['in_use'])
+        try:
+            return await super().do_request(*args, pool_timeout=pool_timeout, **kwargs)
+        finally:
+            stats['in_use'] -= 1
+            self._slots.release()
+
+    def get_stats(self):
+        """Метрики пула: ожидание соединения и насыщенность"""
+        stats = dict(self.stats)
+        requests_count = stats['requests'] or 1
+        stats['pool_size'] = self.pool_size
+        stats['avg_wait_ms'] = round(stats['total_wait'] / requests_count * 1000, 2)
+        stats['max_wait_ms'] = round(stats['max_wait'] * 1000, 2)
+        stats['peak_saturation'] = round(stats['peak_in_use'] / self.pool_size, 2)
+        return stats
+
+def build_request(name, pool_size):
+    """Создание отдельного транспорта с заданным размером пула"""
+    http_version = HTTP_VERSION
+    if http_version == '2':
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("HTTP/2 недоступен (нужен пакет httpx[http2]), используется HTTP/1.1")
+            http_version = '1.1'
+
+    limits = httpx.Limits(
+        max_connections=pool_size,
+        max_keepalive_connections=pool_size,
+        keepalive_expiry=KEEPALIVE_EXPIRY
+    )
+    return InstrumentedRequest(
+        name,
+        connection_pool_size=pool_size,
+        pool_timeout=POOL_TIMEOUT,
+        http_version=http_version,
+        httpx_kwargs={'limits': limits}
+    )
+
+send_request = build_request('send', SEND_POOL_SIZE)
+updates_request = build_request('updates', UPDATES_POOL_SIZE)
+
+def log_transport_stats():
+    """Запись метрик транспорта и объединения запросов в лог"""
+    for request in (send_request, updates_request):
+        stats = request.get_stats()
+        logger.info(
+            f"Transport '{request.name}': pool={stats['pool_size']}, requests={stats['requests']}, "
+            f"waited={stats['waited']}, saturated={stats['saturated']}, timeouts={stats['pool_timeouts']}, "
+            f"avg_wait={stats['avg_wait_ms']}ms, max_wait={stats['max_wait_ms']}ms, "
+            f"peak_saturation={stats['peak_saturation']}"
+        )
+    for key, stats in upstream_flights.get_stats().items():
+        logger.info(f"Single-flight '{key}': {stats}")
+
+async def transport_stats_loop():
+    """Периодическая запись метрик транспорта"""
+    while True:
+        await asyncio.sleep(TRANSPORT_STATS_INTERVAL)
+        log_transport_stats()
+
+def build_warm_state():
+    """Снимок кэшей: погода, file_id фото и состояние каталогов.
+
+    Отрисованные экраны не сохраняются: они зависят и от данных мест в коде,
+    а заново рендерятся за микросекунды.
+    """
+    return {
+        'version': 1,
+        'saved_at': time.time(),
+        'weather': dict(weather_cache),
+        'photo_file_ids': dict(photo_file_ids),
+        'catalog': {
+            'fingerprint': CATALOG_FINGERPRINT,
+            'languages': sorted(CATALOGS)
+        }
+    }
+
+def write_warm_state(state):
+    """Атомарная запись снимка на диск"""
+    # Свой временный файл на каждую запись: отменённое периодическое сохранение
+    # может ещё дописываться в потоке, пока идёт финальное
+    tmp_path = f"{WARM_STATE_PATH}.{id(state)}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, WARM_STATE_PATH)
+
+async def save_warm_state():
+    """Сохранить снимок тёплого состояния (запись в отдельном потоке)"""
+    state = build_warm_state()
+    try:
+        await asyncio.to_thread(write_warm_state, state)
+    except Exception as e:
+        logger.error(f"Warm state save failed: {e}")
+
+async def warm_state_loop():
+    """Периодическое сохранение снимка"""
+    while True:
+        await asyncio.sleep(WARM_STATE_INTERVAL)
+        await save_warm_state()
+
+def load_warm_state():
+    """Восстановить кэши из снимка, сохранённого прошлым запуском"""
+    try:
+        with open(WARM_STATE_PATH, encoding='utf-8') as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        logger.info("Снимок состояния не найден, запуск с пустыми кэшами")
+        return
+    except Exception as e:
+        logger.warning(f"Не удалось прочитать снимок состояния: {e}")
+        return
+
+    if state.get('version') != 1:
+        logger.warning("Снимок состояния устаревшего формата, пропускаем")
+        return
+
+    weather = state.get('weather') or {}
+    if weather.get('data'):
+        weather_cache['data'] = weather['data']
+        weather_cache['fetched_at'] = weather.get('fetched_at', 0.0)
+
+    photo_file_ids.update(state.get('photo_file_ids') or {})
+
+    if (state.get('catalog') or {}).get('fingerprint') != CATALOG_FINGERPRINT:
+        logger.info("Каталоги сообщений изменились с прошлого запуска")
+
+    weather_text = "нет"
+    if weather_cache['data']:
+        weather_text = f"{time.time() - weather_cache['fetched_at']:.0f} с назад"
+    logger.info(
+        f"Снимок состояния загружен: погода {weather_text}, "
+        f"фото {len(photo_file_ids)}"
+    )
+
+# Фоновые циклы бота; останавливаются вручную, а не через Application.stop()
+background_tasks = []
+
+def start_background_tasks():
+    """Запуск периодических фоновых задач"""
+    if TRANSPORT_STATS_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(transport_stats_loop()))
+    background_tasks.append(asyncio.create_task(analytics.flush_loop()))
+    if WARM_STATE_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(warm_state_loop()))
+
+async def stop_background_tasks():
+    """Отмена фоновых задач и ожидание их завершения"""
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
+
+async def post_init(application: Application):
+    """Запуск фоновых задач после инициализации бота"""
+    start_background_tasks()
+    logger.info(f"Бот готов к работе за {time.monotonic() - STARTED_AT:.2f} с")
+
+async def post_shutdown(application: Application):
+    """Итоговые метрики при остановке бота"""
+    await stop_background_tasks()
+    log_transport_stats()
+    await analytics.flush()
+    await save_warm_state()
+
+def build_application(worker_mode=False):
+    """Создание приложения с обработчиками"""
+    builder = (
+        Application.builder()
+        .token(TOKEN)
+        .request(send_request)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+    )
+    if worker_mode:
+        # Апдейты воркеру передаёт процесс приёма, свой опрос не нужен
+        builder = builder.updater(None)
+    else:
+        builder = builder.get_updates_request(updates_request)
+    application = builder.build()
     
     # Обработчики
     application.add_handler(CommandHandler("start", start))
@@ -781,10 +1368,228 @@ def main():
     
     # Обработчик ошибок
     application.add_error_handler(error_handler)
-    
+    return application
+
+def ring_hash(value):
+    """Хеш для кольца консистентного хеширования"""
+    return int(hashlib.md5(value.encode()).hexdigest()[:16], 16)
+
+class HashRing:
+    """Консистентное хеширование ключей (chat_id) по воркерам"""
+
+    def __init__(self, nodes, replicas=100):
+        self._ring = sorted((ring_hash(f"{node}:{i}"), node) for node in nodes for i in range(replicas))
+        self._hashes = [value for value, _ in self._ring]
+
+    def node_for(self, key):
+        """Воркер, отвечающий за ключ"""
+        index = bisect.bisect(self._hashes, ring_hash(str(key))) % len(self._ring)
+        return self._ring[index][1]
+
+def update_shard_key(update):
+    """Ключ шардирования: чат, иначе пользователь, иначе номер апдейта"""
+    if update.effective_chat:
+        return update.effective_chat.id
+    if update.effective_user:
+        return update.effective_user.id
+    return update.update_id
+
+def next_update(update_queue):
+    """Следующий апдейт из очереди; None - сигнал остановки или пропал супервизор"""
+    while True:
+        try:
+            return update_queue.get(timeout=1)
+        except queue.Empty:
+            parent = multiprocessing.parent_process()
+            if parent is not None and not parent.is_alive():
+                logger.warning("Супервизор завершился, воркер останавливается")
+                return None
+
+async def worker_loop(update_queue):
+    """Обработка апдейтов из очереди по одному, в порядке поступления"""
+    application = build_application(worker_mode=True)
+    async with application:
+        await application.start()
+        await application.post_init(application)
+        while True:
+            data = await asyncio.to_thread(next_update, update_queue)
+            if data is None:
+                break
+            await application.process_update(Update.de_json(data, application.bot))
+        await application.stop()
+    await application.post_shutdown(application)
+
+def run_worker(index, update_queue, cache, lock):
+    """Точка входа процесса-воркера"""
+    global shared_cache, shared_lock, WARM_STATE_PATH
+    # Остановку воркера запускает супервизор (через очередь), поэтому Ctrl+C
+    # и SIGTERM на всю группу процессов не прерывают дообработку апдейтов
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    shared_cache = cache
+    shared_lock = lock
+    WARM_STATE_PATH = f"{WARM_STATE_PATH}.{index}"
+
+    analytics.load_salt()
+    load_warm_state()
+    prerender_static_screens()
+    logger.info(f"Воркер {index} запущен (pid {os.getpid()})")
+    asyncio.run(worker_loop(update_queue))
+
+class WorkerSupervisor:
+    """Запуск воркеров, распределение апдейтов по chat_id и перезапуск упавших процессов"""
+
+    def __init__(self, count):
+        self.context = multiprocessing.get_context('spawn')
+        self.manager = self.context.Manager()
+        self.cache = self.manager.dict()
+        self.lock = self.manager.Lock()
+        self.queues = [self.context.Queue() for _ in range(count)]
+        self.ring = HashRing(range(count))
+        self.workers = [None] * count
+        self.dispatched = [0] * count
+        self.restarts = 0
+
+    def start_worker(self, index):
+        """Запустить процесс воркера"""
+        process = self.context.Process(
+            target=run_worker,
+            args=(index, self.queues[index], self.cache, self.lock),
+            name=f"worker-{index}"
+        )
+        process.start()
+        self.workers[index] = process
+
+    def start(self):
+        """Запустить все воркеры"""
+        for index in range(len(self.workers)):
+            self.start_worker(index)
+
+    def dispatch(self, update):
+        """Отправить апдейт воркеру, отвечающему за его чат"""
+        index = self.ring.node_for(update_shard_key(update))
+        self.queues[index].put(update.to_dict())
+        self.dispatched[index] += 1
+
+    def replace_queue(self, index):
+        """Новая очередь для перезапускаемого воркера.
+
+        Воркер мог погибнуть внутри get() с захваченной блокировкой чтения:
+        из такой очереди новый процесс уже ничего не получит. Апдейты, которые
+        не успели дойти до упавшего воркера, теряются.
+        """
+        old_queue = self.queues[index]
+        try:
+            lost = old_queue.qsize()
+        except NotImplementedError:
+            lost = None
+        # Не ждать при выходе, пока фоновый поток очереди допишет её в канал
+        old_queue.cancel_join_thread()
+        old_queue.close()
+        self.queues[index] = self.context.Queue()
+        if lost:
+            logger.warning(f"Воркер {index}: потеряно недоставленных апдейтов: {lost}")
+
+    def check_workers(self):
+        """Перезапустить упавшие воркеры"""
+        for index, process in enumerate(self.workers):
+            if not process.is_alive():
+                self.restarts += 1
+                logger.warning(f"Воркер {index} завершился с кодом {process.exitcode}, перезапуск")
+                self.replace_queue(index)
+                self.start_worker(index)
+
+    async def supervise(self):
+        """Периодическая проверка воркеров"""
+        while True:
+            await asyncio.sleep(WORKER_CHECK_INTERVAL)
+            self.check_workers()
+
+    def stop(self):
+        """Остановить воркеры после обработки уже полученных апдейтов"""
+        for update_queue in self.queues:
+            update_queue.put(None)
+        for index, process in enumerate(self.workers):
+            process.join(timeout=WORKER_SHUTDOWN_TIMEOUT)
+            if process.is_alive():
+                logger.warning(f"Воркер {index} не остановился за {WORKER_SHUTDOWN_TIMEOUT} с, завершаем")
+                process.kill()
+        self.manager.shutdown()
+        logger.info(f"Воркеры остановлены: апдейтов по воркерам {self.dispatched}, перезапусков {self.restarts}")
+
+async def run_ingress(supervisor):
+    """Приём апдейтов через getUpdates и раздача их воркерам"""
+    bot = Bot(TOKEN, request=send_request, get_updates_request=updates_request)
+    async with bot:
+        supervise_task = asyncio.create_task(supervisor.supervise())
+        logger.info(f"Бот готов к работе за {time.monotonic() - STARTED_AT:.2f} с (воркеров: {len(supervisor.workers)})")
+        offset = None
+        try:
+            while True:
+                try:
+                    updates = await bot.get_updates(
+                        offset=offset,
+                        timeout=INGRESS_POLL_TIMEOUT,
+                        allowed_updates=Update.ALL_TYPES
+                    )
+                except TelegramError as e:
+                    logger.warning(f"Ingress getUpdates failed: {e}")
+                    await asyncio.sleep(1)
+                    continue
+
+                for update in updates:
+                    supervisor.dispatch(update)
+                    offset = update.update_id + 1
+        finally:
+            supervise_task.cancel()
+            # Подтверждаем Telegram уже розданные апдейты, чтобы не получить их повторно
+            if offset is not None:
+                try:
+                    await bot.get_updates(offset=offset, timeout=0, limit=1)
+                except TelegramError as e:
+                    logger.warning(f"Ingress final getUpdates failed: {e}")
+
+def run_sharded():
+    """Многопроцессный режим: процесс приёма апдейтов и BOT_WORKERS воркеров"""
+    # SIGTERM останавливает бота так же, как Ctrl+C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    supervisor = WorkerSupervisor(WORKERS)
+    supervisor.start()
+    try:
+        asyncio.run(run_ingress(supervisor))
+    except KeyboardInterrupt:
+        logger.info("Получен сигнал остановки")
+    finally:
+        supervisor.stop()
+
+def main():
+    """Основная функция"""
     print("🏙️ Бот-гид по Улан-Удэ запущен!")
     logger.info("Бот запущен успешно")
+    
+    # Соль создаётся до запуска воркеров, они её только читают
+    analytics.load_salt()
+    
+    if WORKERS > 0:
+        run_sharded()
+        return
+    
+    application = build_application()
+    
+    # Сначала восстанавливаем кэши из снимка, недостающее отрисовываем заново
+    load_warm_state()
+    prerender_static_screens()
+    
     application.run_polling()
 
+def print_analytics_report():
+    """Офлайн-отчёт по аналитике: python bot.py report [дней]"""
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+    print(analytics.report(days))
+
 if __name__ == '__main__':
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == 'report':
+        print_analytics_report()
+    else:
+        main()
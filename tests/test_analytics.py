@@ -0,0 +1,63 @@
+import asyncio
+import hashlib
+
+import bot
+from bot import Analytics
+
+
+def test_salt_is_generated_and_persisted(tmp_path, monkeypatch):
+    salt_path = tmp_path / 'analytics.salt'
+    monkeypatch.setattr(bot, 'ANALYTICS_SALT', '')
+    monkeypatch.setattr(bot, 'ANALYTICS_SALT_PATH', str(salt_path))
+
+    salt = bot.load_analytics_salt()
+
+    assert len(salt) == 64
+    assert salt_path.read_text() == salt
+    assert bot.load_analytics_salt() == salt
+    assert bot.hash_chat_id(1, salt) != hashlib.sha256(b'1').hexdigest()[:16]
+
+
+def test_failed_flush_returns_events_to_buffer(tmp_path, monkeypatch):
+    analytics = Analytics(str(tmp_path / 'analytics.db'), buffer_size=10)
+    analytics.salt = 'test'
+    for chat_id in range(3):
+        analytics.record('weather', chat_id, 0.01)
+
+    def fail(events):
+        raise RuntimeError('database is locked')
+
+    monkeypatch.setattr(analytics, '_write', fail)
+    asyncio.run(analytics.flush())
+    assert len(analytics.buffer) == 3
+
+    monkeypatch.undo()
+    asyncio.run(analytics.flush())
+    assert len(analytics.buffer) == 0
+    assert 'weather' in analytics.report()
+
+
+def test_requeue_keeps_newest_events_when_buffer_is_full():
+    analytics = Analytics(':memory:', buffer_size=3)
+    analytics.buffer.extend(['new1', 'new2'])
+
+    analytics.requeue(['old1', 'old2', 'old3'])
+
+    assert list(analytics.buffer) == ['old3', 'new1', 'new2']
+    assert analytics.dropped == 2
+
+
+def test_report_shows_terms_and_weather_providers(tmp_path):
+    analytics = Analytics(str(tmp_path / 'analytics.db'), buffer_size=100)
+    analytics.salt = 'test'
+    for provider in ('visual_crossing', 'visual_crossing', 'weatherapi'):
+        analytics.record('weather', 1, 0.1, provider)
+    for term in ('погода', 'погода', 'other'):
+        analytics.record('text', 2, 0.01, term=term)
+    asyncio.run(analytics.flush())
+
+    report = analytics.report(1)
+
+    assert 'weather' in report and 'text' in report
+    assert 'источники погоды: visual_crossing 2, weatherapi 1' in report
+    assert 'слова: погода 2, other 1' in report
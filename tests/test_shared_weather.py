@@ -0,0 +1,94 @@
+import multiprocessing
+import threading
+import time
+
+import bot
+
+
+def crash_while_holding(lock):
+    lock.acquire()
+    import os
+    os._exit(1)
+
+
+def test_workers_share_one_fetch_and_survive_a_stuck_lease(monkeypatch):
+    manager = multiprocessing.get_context('spawn').Manager()
+    try:
+        monkeypatch.setattr(bot, 'shared_cache', manager.dict())
+        monkeypatch.setattr(bot, 'shared_lock', manager.Lock())
+        monkeypatch.setattr(bot, 'WEATHER_FETCH_LEASE', 1)
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.3)
+            return {'data': {'temp': 1}, 'fetched_at': time.time()}, None
+
+        monkeypatch.setattr(bot, 'fetch_weather_entry', fetch)
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(bot.fetch_weather_shared())) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1
+        assert all(entry['data'] == {'temp': 1} for entry, error in results)
+
+        # Лидер упал посреди запроса: аренда осталась занятой, но истекает
+        bot.shared_cache.clear()
+        bot.shared_cache['weather_lease'] = (time.time() + 1, 'crashed')
+        entry, error = bot.fetch_weather_shared()
+        assert entry['data'] == {'temp': 1}
+        assert len(calls) == 2
+    finally:
+        manager.shutdown()
+
+
+def test_lock_lost_by_crashed_process_falls_back_to_local_fetch(monkeypatch):
+    context = multiprocessing.get_context('spawn')
+    manager = context.Manager()
+    try:
+        lock = manager.Lock()
+        process = context.Process(target=crash_while_holding, args=(lock,))
+        process.start()
+        process.join()
+
+        monkeypatch.setattr(bot, 'shared_cache', manager.dict())
+        monkeypatch.setattr(bot, 'shared_lock', lock)
+        monkeypatch.setattr(bot, 'SHARED_LOCK_TIMEOUT', 0.5)
+        monkeypatch.setattr(bot, 'fetch_weather_entry', lambda: ('local', None))
+
+        assert bot.fetch_weather_shared() == ('local', None)
+    finally:
+        manager.shutdown()
+
+
+def test_broker_gone_falls_back_to_local_fetch(monkeypatch):
+    manager = multiprocessing.get_context('spawn').Manager()
+    cache, lock = manager.dict(), manager.Lock()
+    manager.shutdown()
+    monkeypatch.setattr(bot, 'shared_cache', cache)
+    monkeypatch.setattr(bot, 'shared_lock', lock)
+    monkeypatch.setattr(bot, 'fetch_weather_entry', lambda: ('local', None))
+
+    assert bot.fetch_weather_shared() == ('local', None)
+
+
+def test_expired_leader_keeps_the_new_leaders_lease(monkeypatch):
+    monkeypatch.setattr(bot, 'shared_cache', {})
+    monkeypatch.setattr(bot, 'shared_lock', threading.Lock())
+    other_lease = (time.time() + 30, 'other')
+
+    def slow_fetch():
+        # Пока шёл запрос, аренда истекла и её забрал другой воркер
+        bot.shared_cache['weather_lease'] = other_lease
+        return {'data': {'temp': 1}, 'fetched_at': time.time()}, None
+
+    monkeypatch.setattr(bot, 'fetch_weather_entry', slow_fetch)
+
+    entry, error = bot.fetch_weather_shared()
+
+    assert entry['data'] == {'temp': 1}
+    assert bot.shared_cache['weather_lease'] == other_lease
+    assert bot.shared_cache['weather'] == entry
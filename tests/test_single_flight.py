@@ -0,0 +1,94 @@
+import asyncio
+import threading
+
+import pytest
+
+from bot import SingleFlight
+
+
+def test_concurrent_calls_share_one_flight():
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return 'weather'
+
+    async def scenario():
+        flights = SingleFlight()
+        tasks = [asyncio.create_task(flights.do('weather', fetch)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        release.set()
+        return flights, await asyncio.gather(*tasks)
+
+    flights, results = asyncio.run(scenario())
+
+    assert results == ['weather'] * 5
+    assert len(calls) == 1
+    assert flights.get_stats()['weather'] == {'calls': 5, 'flights': 1, 'shared': 4, 'max_fan_in': 5}
+    assert flights._in_flight == {}
+
+
+def test_error_is_shared_by_all_callers():
+    release = threading.Event()
+
+    def fetch():
+        release.wait(5)
+        raise ValueError('upstream down')
+
+    async def scenario():
+        flights = SingleFlight()
+        tasks = [asyncio.create_task(flights.do('weather', fetch)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        release.set()
+        return flights, await asyncio.gather(*tasks, return_exceptions=True)
+
+    flights, results = asyncio.run(scenario())
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flights._in_flight == {}
+
+
+def test_new_flight_after_previous_finished():
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return len(calls)
+
+    async def scenario():
+        flights = SingleFlight()
+        first = await flights.do('weather', fetch)
+        second = await flights.do('weather', fetch)
+        return first, second
+
+    assert asyncio.run(scenario()) == (1, 2)
+
+
+def test_cancelled_leader_does_not_hang_waiters():
+    release = threading.Event()
+
+    def fetch():
+        release.wait(5)
+        return 'weather'
+
+    async def scenario():
+        flights = SingleFlight()
+        leader = asyncio.create_task(flights.do('weather', fetch))
+        await asyncio.sleep(0.05)
+        waiter = asyncio.create_task(flights.do('weather', fetch))
+        await asyncio.sleep(0.05)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+        release.set()
+        result = await asyncio.wait_for(waiter, timeout=3)
+        return flights, result
+
+    flights, result = asyncio.run(scenario())
+
+    assert result == 'weather'
+    assert flights._in_flight == {}
@@ -0,0 +1,62 @@
+import pytest
+
+import bot
+from bot import CATALOGS, Template
+
+
+def test_values_are_html_escaped():
+    template = Template('<b>{name}</b> <a href="{map_url}">{title_html}</a>')
+
+    rendered = template.render(name='A & <B>_*', map_url='https://x?a=1&b="2"', title_html='<i>ok</i>')
+
+    assert rendered == '<b>A &amp; &lt;B&gt;_*</b> <a href="https://x?a=1&amp;b=&quot;2&quot;"><i>ok</i></a>'
+
+
+def test_format_spec_and_conversion_are_applied():
+    template = Template('{x:.1f} {y!r} {z:>3}')
+
+    assert template.render(x=1.23456, y='<a>', z=7) == "1.2 '&lt;a&gt;'   7"
+
+
+@pytest.mark.parametrize('source', ['{x.attr}', '{x[0]}', '{x:{width}}', '{}'])
+def test_unsupported_fields_fail_at_compile_time(source):
+    with pytest.raises(ValueError):
+        Template(source)
+
+
+def test_catalogs_render_every_static_screen():
+    from bot import STATIC_SCREENS, render_static_screen
+
+    for language in CATALOGS:
+        for name in STATIC_SCREENS:
+            assert render_static_screen(language, name)
+
+
+@pytest.mark.parametrize('text, language, expected', [
+    ('какая погода сегодня', 'ru', 'погода'),
+    ('расскажи про байкале', 'ru', 'байкал'),
+    ('what time is it', 'ru', None),
+    ('новая дата', 'en', 'дата'),
+    ('what time is it', 'en', 'what time'),
+    ('please update sometimes', 'en', None),
+    ('citywide menus', 'en', None),
+])
+def test_triggers_match_the_users_catalog(text, language, expected):
+    assert bot.match_trigger(text, language) == expected
+
+
+def test_error_screens_exist_in_every_language():
+    for language in CATALOGS:
+        for kind in bot.WEATHER_ERROR_KINDS:
+            assert bot.static_screen(language, f'weather_error_{kind}').startswith('❌')
+        assert bot.static_screen(language, 'datetime_error').startswith('❌')
+
+
+def test_english_weather_screen_leaves_out_the_russian_description():
+    values = dict(
+        emoji='☀️', temp=1, feels_like=0, description='ясно', humidity=50, pressure=1000,
+        wind_speed=1.0, visibility=10, uv_index=1, sun_html='', updated='12:00'
+    )
+
+    assert 'ясно' in CATALOGS['ru'].render('weather', **values)
+    assert 'ясно' not in CATALOGS['en'].render('weather', **values)
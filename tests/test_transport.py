@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+from telegram.error import TimedOut
+from telegram.request import HTTPXRequest
+
+import bot
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Заглушка сетевого запроса: держит соединение, пока не откроют release"""
+    calls = []
+
+    async def do_request(self, *args, pool_timeout=None, **kwargs):
+        calls.append(pool_timeout)
+        await calls_release.wait()
+        return 200, b'{"ok": true}'
+
+    calls_release = asyncio.Event()
+    monkeypatch.setattr(HTTPXRequest, 'do_request', do_request)
+    return calls, calls_release
+
+
+def test_burst_counts_waits_and_saturation(upstream):
+    calls, release = upstream
+
+    async def scenario():
+        request = bot.build_request('test', 1)
+        tasks = [asyncio.create_task(request.do_request('url', 'POST')) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        release.set()
+        await asyncio.gather(*tasks)
+        return request.get_stats()
+
+    stats = asyncio.run(scenario())
+
+    assert stats['requests'] == 3
+    assert stats['saturated'] == 2
+    assert stats['waited'] == 2
+    assert stats['max_wait_ms'] >= 40
+    assert stats['peak_in_use'] == 1
+    assert stats['in_use'] == 0
+    assert 'saturation' not in stats
+
+
+def test_pool_timeout_raises_timed_out(upstream):
+    calls, release = upstream
+
+    async def scenario():
+        request = bot.build_request('test', 1)
+        holder = asyncio.create_task(request.do_request('url', 'POST'))
+        await asyncio.sleep(0.01)
+        with pytest.raises(TimedOut):
+            await request.do_request('url', 'POST', pool_timeout=0.05)
+        release.set()
+        await holder
+        return request.get_stats()
+
+    stats = asyncio.run(scenario())
+
+    assert stats['pool_timeouts'] == 1
+    assert stats['requests'] == 2
+    assert len(calls) == 1
+
+
+def test_explicit_none_pool_timeout_waits_without_limit(upstream, monkeypatch):
+    calls, release = upstream
+    monkeypatch.setattr(bot, 'POOL_TIMEOUT', 0.01)
+
+    async def scenario():
+        request = bot.build_request('test', 1)
+        holder = asyncio.create_task(request.do_request('url', 'POST'))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(request.do_request('url', 'POST', pool_timeout=None))
+        # Настроенный таймаут (0.01 с) давно истёк, а запрос всё ещё ждёт
+        await asyncio.sleep(0.1)
+        assert not waiter.done()
+        release.set()
+        await asyncio.gather(holder, waiter)
+        return request.get_stats()
+
+    stats = asyncio.run(scenario())
+
+    assert stats['pool_timeouts'] == 0
+    assert calls[-1] is None
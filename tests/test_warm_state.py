@@ -0,0 +1,15 @@
+import bot
+
+
+def test_snapshot_does_not_carry_rendered_screens(tmp_path, monkeypatch):
+    monkeypatch.setattr(bot, 'WARM_STATE_PATH', str(tmp_path / 'warm_state.json'))
+    monkeypatch.setitem(bot.photo_file_ids, 'https://example.com/photo.jpg', 'file-id')
+    bot.prerender_static_screens()
+
+    bot.write_warm_state(bot.build_warm_state())
+    bot.rendered_screens.clear()
+    bot.photo_file_ids.clear()
+    bot.load_warm_state()
+
+    assert bot.rendered_screens == {}
+    assert bot.photo_file_ids == {'https://example.com/photo.jpg': 'file-id'}
@@ -0,0 +1,52 @@
+import os
+import signal
+import time
+
+from telegram import Update
+
+import bot
+
+
+def echo_worker(index, update_queue, cache, lock):
+    """Воркер без бота: отмечает в общем кэше, какой процесс получил апдейт"""
+    while True:
+        data = bot.next_update(update_queue)
+        if data is None:
+            return
+        cache[data['update_id']] = os.getpid()
+
+
+def wait_for(cache, key, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if key in cache:
+            return cache[key]
+        time.sleep(0.05)
+    raise AssertionError(f"апдейт {key} не дошёл до воркера")
+
+
+def test_restarted_worker_receives_updates(monkeypatch):
+    monkeypatch.setattr(bot, 'run_worker', echo_worker)
+    monkeypatch.setattr(bot, 'WORKER_SHUTDOWN_TIMEOUT', 10)
+    supervisor = bot.WorkerSupervisor(1)
+    supervisor.start()
+    try:
+        supervisor.dispatch(Update(update_id=1))
+        first_pid = wait_for(supervisor.cache, 1)
+
+        # Простаивающий воркер почти всё время ждёт внутри get()
+        time.sleep(0.3)
+        os.kill(first_pid, signal.SIGKILL)
+        supervisor.workers[0].join(5)
+        supervisor.check_workers()
+
+        supervisor.dispatch(Update(update_id=2))
+        second_pid = wait_for(supervisor.cache, 2)
+        assert second_pid != first_pid
+        assert supervisor.restarts == 1
+    finally:
+        started = time.monotonic()
+        supervisor.stop()
+    # Новый воркер прочитал сигнал остановки, а не был убит по таймауту
+    assert time.monotonic() - started < 10
+    assert supervisor.workers[0].exitcode == 0